@@ -18,11 +18,20 @@ import sys
 import os
 import io
 import json
+import gzip
+import math
+import hmac
+import hashlib
+import functools
 import random
 import base64
 import sqlite3
+import threading
+import queue
+import time
 from pathlib import Path
 from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # optional .env
 try:
@@ -108,12 +117,81 @@ QListWidget { border:1px solid #22303a; background:#071018; }
 # category color hints (for list background)
 CATEGORY_COLORS = ["#e6f2ff","#fff7ed","#f0f9ff","#fff1f2","#f7fee9","#fef3f2","#f0f4f8","#f3f4f6","#fff8f1","#f8fafc","#f6f7fb","#f2f8ee"]
 
+# QColor objects parsed once, built lazily so module import stays Qt-light
+_CATEGORY_QCOLORS = None
+
+def category_qcolor(i):
+    global _CATEGORY_QCOLORS
+    if _CATEGORY_QCOLORS is None:
+        _CATEGORY_QCOLORS = [QtGui.QColor(c) for c in CATEGORY_COLORS]
+    return _CATEGORY_QCOLORS[i % len(_CATEGORY_QCOLORS)]
+
+# ---------------- Password hashing ----------------
+def _hash_password(password, salt=None):
+    # salted blake2b, stored as "salt$digest"; fast enough for a local login
+    # while keeping plaintext out of the users table
+    if salt is None:
+        salt = os.urandom(8).hex()
+    digest = hashlib.blake2b(password.encode(), digest_size=16, salt=bytes.fromhex(salt)).hexdigest()
+    return f"{salt}${digest}"
+
+def _is_password_hash(stored):
+    # our hashes are exactly 16 hex chars (8-byte salt) + '$' + 32 hex chars
+    # (16-byte digest); anything else is a legacy plaintext password, which
+    # may itself contain '$'
+    salt, sep, digest = stored.partition('$')
+    if not sep or len(salt) != 16 or len(digest) != 32:
+        return False
+    try:
+        bytes.fromhex(salt)
+        bytes.fromhex(digest)
+    except ValueError:
+        return False
+    return True
+
+def _check_password(password, stored):
+    if not _is_password_hash(stored):
+        # legacy plaintext row; compare as bytes so non-ASCII input can't
+        # raise out of compare_digest
+        return hmac.compare_digest(password.encode(), stored.encode())
+    salt = stored.partition('$')[0]
+    return hmac.compare_digest(_hash_password(password, salt), stored)
+
 # ---------------- Database Helper ----------------
 class DB:
     def __init__(self, filename=DB_FILE):
-        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.filename = filename
+        # one connection per thread (created lazily by the conn property), so
+        # background work never contends on a shared connection's mutex; WAL
+        # lets those readers run while the GUI thread writes
+        self._local = threading.local()
+        # in-process caches; settings and product rows are read far more often
+        # than they change, so a dict lookup beats a SQLite round-trip.
+        # settings load in one SELECT on first read (None = not loaded yet)
+        self._setting_cache = None
+        self._sku_cache = {}
+        self._category_cache = {}
         self._init_tables()
 
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename)
+            self._apply_pragmas(conn)
+            self._local.conn = conn
+        return conn
+
+    def _apply_pragmas(self, conn):
+        # WAL + NORMAL: commits fsync the WAL only, so bursty checkout writes
+        # (invoice save, stock updates) don't pay a full journal fsync each,
+        # and readers no longer block writers.
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        conn.execute('PRAGMA mmap_size=268435456')
+
     def _init_tables(self):
         cur = self.conn.cursor()
         cur.execute('''CREATE TABLE IF NOT EXISTS products (
@@ -126,6 +204,11 @@ class DB:
             id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT, role TEXT
         )''')
         cur.execute('''CREATE TABLE IF NOT EXISTS settings (k TEXT PRIMARY KEY, v TEXT)''')
+        # inventory view fetches by category on every keystroke; keep those O(log n)
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_products_category_name ON products(category, name)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock)')
         self.conn.commit()
         self._seed_defaults()
 
@@ -133,8 +216,8 @@ class DB:
         cur = self.conn.cursor()
         cur.execute('SELECT COUNT(*) FROM users')
         if cur.fetchone()[0] == 0:
-            cur.execute('INSERT INTO users (username,password,role) VALUES (?,?,?)', ('myadmin','1234','admin'))
-            cur.execute('INSERT INTO users (username,password,role) VALUES (?,?,?)', ('employee','1111','staff'))
+            cur.execute('INSERT INTO users (username,password,role) VALUES (?,?,?)', ('myadmin', _hash_password('1234'), 'admin'))
+            cur.execute('INSERT INTO users (username,password,role) VALUES (?,?,?)', ('employee', _hash_password('1111'), 'staff'))
         cur.execute('INSERT OR IGNORE INTO settings (k,v) VALUES (?,?)', ('store_name','Smart Desk Mart'))
         cur.execute('INSERT OR IGNORE INTO settings (k,v) VALUES (?,?)', ('theme','light'))
         cur.execute('INSERT OR IGNORE INTO settings (k,v) VALUES (?,?)', ('gh_owner', DEFAULT_GH_OWNER))
@@ -147,12 +230,16 @@ class DB:
         self.conn.commit()
 
     # products
+    def _invalidate_products(self):
+        self._category_cache.clear()
+
     def insert_product(self, sku, name, category, unit, hsn, gst, mrp, stock):
         cur = self.conn.cursor()
         try:
             cur.execute('INSERT INTO products (sku,name,category,unit,hsn,gst,mrp,stock) VALUES (?,?,?,?,?,?,?,?)',
                         (sku, name, category, unit, hsn, gst, mrp, stock))
             self.conn.commit()
+            self._invalidate_products()
             return cur.lastrowid
         except sqlite3.IntegrityError:
             return None
@@ -162,34 +249,93 @@ class DB:
         cur.execute('SELECT id,sku,name,category,unit,hsn,gst,mrp,stock FROM products WHERE category=?', (category,))
         return cur.fetchall()
 
+    def products_by_category_cached(self, category):
+        # the inventory view refetches the current category on every
+        # keystroke; serve those from memory and drop the cache on any
+        # product write
+        return self._category_pack(category)[0]
+
+    def category_search_haystack(self, category):
+        # lowercased "sku name" strings parallel to products_by_category_cached,
+        # built once per category instead of re-lowering every row per keystroke
+        return self._category_pack(category)[1]
+
+    def _category_pack(self, category):
+        pack = self._category_cache.get(category)
+        if pack is None:
+            rows = self.products_by_category(category)
+            haystack = [f"{r[1]} {r[2]}".lower() for r in rows]
+            pack = (rows, haystack)
+            self._category_cache[category] = pack
+        return pack
+
     def list_products(self):
         cur = self.conn.cursor()
         cur.execute('SELECT id,sku,name,category,unit,hsn,gst,mrp,stock FROM products')
         return cur.fetchall()
 
     def get_product_by_sku(self, sku):
+        if sku in self._sku_cache:
+            return self._sku_cache[sku]
         cur = self.conn.cursor()
         cur.execute('SELECT id,sku,name,category,unit,hsn,gst,mrp,stock FROM products WHERE sku=?', (sku,))
-        return cur.fetchone()
+        r = cur.fetchone()
+        if r:
+            self._sku_cache[sku] = r
+        return r
 
-    def update_stock(self, sku, delta):
+    def get_products_by_skus(self, skus):
+        if not skus:
+            return []
         cur = self.conn.cursor()
-        cur.execute('UPDATE products SET stock=stock+? WHERE sku=?', (delta, sku))
-        self.conn.commit()
+        placeholders = ','.join('?' * len(skus))
+        cur.execute(f'SELECT id,sku,name,category,unit,hsn,gst,mrp,stock FROM products WHERE sku IN ({placeholders})', list(skus))
+        rows = cur.fetchall()
+        for r in rows:
+            self._sku_cache[r[1]] = r
+        return rows
 
-    def save_invoice(self, invoice_no, phone, data_dict, file_path):
+    def update_stock(self, sku, delta):
         cur = self.conn.cursor()
-        cur.execute('INSERT INTO invoices (invoice_no,customer_phone,data,file_path,created_at) VALUES (?,?,?,?,?)',
-                    (invoice_no, phone, json.dumps(data_dict), file_path, datetime.now(timezone.utc).isoformat()))
+        cur.execute('UPDATE products SET stock=stock+? WHERE sku=?', (delta, sku))
         self.conn.commit()
+        self._sku_cache.pop(sku, None)
+        self._invalidate_products()
+
+    def save_checkout(self, invoice_no, phone, data_dict, file_path, sku_pairs=(), name_pairs=()):
+        # invoice insert plus all stock deductions under one BEGIN IMMEDIATE,
+        # so a checkout costs a single WAL fsync and can't half-apply
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('INSERT INTO invoices (invoice_no,customer_phone,data,file_path,created_at) VALUES (?,?,?,?,?)',
+                         (invoice_no, phone, json.dumps(data_dict), file_path, datetime.now(timezone.utc).isoformat()))
+            if sku_pairs:
+                conn.executemany('UPDATE products SET stock=stock+? WHERE sku=?', sku_pairs)
+            if name_pairs:
+                conn.executemany('UPDATE products SET stock=stock+? WHERE name=?', name_pairs)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        for _, sku in sku_pairs:
+            self._sku_cache.pop(sku, None)
+        if name_pairs:
+            self._sku_cache.clear()
+        self._invalidate_products()
 
     def validate_user(self, username, password, role):
         cur = self.conn.cursor()
-        cur.execute('SELECT role FROM users WHERE username=? AND password=?', (username, password))
+        cur.execute('SELECT password, role FROM users WHERE username=?', (username,))
         r = cur.fetchone()
         if not r:
             return False
-        db_role = r[0]
+        stored, db_role = r
+        if not _check_password(password, stored):
+            return False
+        if not _is_password_hash(stored):
+            # upgrade a legacy plaintext row in place
+            self.set_user(username, password, db_role)
         if role == 'Admin':
             return db_role == 'admin'
         else:
@@ -197,19 +343,22 @@ class DB:
 
     def set_user(self, username, password, role):
         cur = self.conn.cursor()
-        cur.execute('INSERT OR REPLACE INTO users (username,password,role) VALUES (?,?,?)', (username, password, role))
+        cur.execute('INSERT OR REPLACE INTO users (username,password,role) VALUES (?,?,?)', (username, _hash_password(password), role))
         self.conn.commit()
 
     def set_setting(self, k, v):
         cur = self.conn.cursor()
         cur.execute('INSERT OR REPLACE INTO settings (k,v) VALUES (?,?)', (k, v))
         self.conn.commit()
+        if self._setting_cache is not None:
+            self._setting_cache[k] = v
 
     def get_setting(self, k, default=None):
-        cur = self.conn.cursor()
-        cur.execute('SELECT v FROM settings WHERE k=?', (k,))
-        r = cur.fetchone()
-        return r[0] if r else default
+        if self._setting_cache is None:
+            cur = self.conn.cursor()
+            cur.execute('SELECT k,v FROM settings')
+            self._setting_cache = dict(cur.fetchall())
+        return self._setting_cache.get(k, default)
 
     def export_all(self):
         data = {"products": [], "invoices": []}
@@ -219,7 +368,6 @@ class DB:
             })
         cur = self.conn.cursor()
         cur.execute('SELECT id,invoice_no,customer_phone,file_path,data,created_at FROM invoices')
-        data["invoices"] = []
         for r in cur.fetchall():
             data["invoices"].append({"id": r[0], "invoice_no": r[1], "customer_phone": r[2], "file_path": r[3], "data": json.loads(r[4]), "created_at": r[5]})
         return data
@@ -236,50 +384,51 @@ WORDS = [
     "Car Wax", "Vitamin C", "Yoga Mat", "Door Sensor", "LED Bulb"
 ]
 
+# precomputed so the seeding loop does a dict lookup instead of an
+# O(len(CATEGORIES)) index scan per row
+_HSN_BY_CAT = {c: f"{1000 + i + 1:04d}" for i, c in enumerate(CATEGORIES)}
+
 def gen_hsn_for_category(cat):
-    idx = CATEGORIES.index(cat) + 1
-    return f"{1000 + idx:04d}"
+    return _HSN_BY_CAT[cat]
 
 def seed_products(db: DB, target=1100):
     cur = db.conn.cursor()
     cur.execute('SELECT COUNT(*) FROM products')
     if cur.fetchone()[0] >= target:
         return
-    sku = 10000
-    created = 0
-    # generate non-chocolate items until target-500
-    while created < (target - 500):
-        for cat in CATEGORIES:
-            if cat == "Chocolate": continue
-            if created >= (target - 500): break
-            name = f"{random.choice(ADJ)} {random.choice(WORDS)}"
-            unit = random.choice(UNITS)
-            if unit == "gram":
-                g = random.choice(GRAM_VARIANTS)
-                name = f"{name} {g}g"
-            gst = GST_RATES.get(cat, 18)
-            hsn = gen_hsn_for_category(cat)
-            mrp = round(random.uniform(30, 2000), 2)
-            stock = random.randint(0,200)
-            sku_code = f"SKU{sku}"
-            db.insert_product(sku_code, name, cat, unit, hsn, gst, mrp, stock)
-            sku += 1
-            created += 1
-            if created >= (target - 500):
-                break
+    n = max(target - 500, 0)
+    cats = [c for c in CATEGORIES if c != "Chocolate"]
+    # draw all random attributes up front instead of one random.* call per
+    # field per row; round-robin over categories as before
+    adjs = random.choices(ADJ, k=n)
+    words = random.choices(WORDS, k=n)
+    units = random.choices(UNITS, k=n)
+    grams = random.choices(GRAM_VARIANTS, k=n)
+    uniform, randint = random.uniform, random.randint
+    rows = []
+    for i in range(n):
+        cat = cats[i % len(cats)]
+        name = f"{adjs[i]} {words[i]}"
+        unit = units[i]
+        if unit == "gram":
+            name = f"{name} {grams[i]}g"
+        rows.append((f"SKU{10000 + i}", name, cat, unit, gen_hsn_for_category(cat),
+                     GST_RATES.get(cat, 18), round(uniform(30, 2000), 2), randint(0, 200)))
     # chocolate: 500 items from ₹1 to ₹500
+    choc_grams = random.choices(GRAM_VARIANTS, k=500)
+    choc_hsn = gen_hsn_for_category("Chocolate")
+    choc_gst = GST_RATES.get("Chocolate", 18)
     for i in range(1,501):
         price = float(i)
         unit = "piece" if i % 7 else "gram"
         name = f"ChocolateVar {i}"
         if unit == "gram":
-            g = random.choice(GRAM_VARIANTS)
-            name = f"{name} {g}g"
-        hsn = gen_hsn_for_category("Chocolate")
-        gst = GST_RATES.get("Chocolate", 18)
-        sku_code = f"CHC{i:04d}"
-        stock = random.randint(10,300)
-        db.insert_product(sku_code, name, "Chocolate", unit, hsn, gst, price, stock)
+            name = f"{name} {choc_grams[i-1]}g"
+        rows.append((f"CHC{i:04d}", name, "Chocolate", unit, choc_hsn, choc_gst, price, randint(10,300)))
+    # single transaction: one fsync for all ~1100 rows instead of one per insert
+    cur.executemany('INSERT OR IGNORE INTO products (sku,name,category,unit,hsn,gst,mrp,stock) VALUES (?,?,?,?,?,?,?,?)', rows)
+    db.conn.commit()
+    db._invalidate_products()
 
 # ---------------- GitHub uploader ----------------
 class GitHubUploader:
@@ -288,12 +437,18 @@ class GitHubUploader:
         self.owner = owner
         self.repo = repo
         self.api = f"https://api.github.com/repos/{owner}/{repo}"
+        # one keep-alive session: the GET+PUT pair (and recurring backups)
+        # reuse the TCP+TLS connection instead of handshaking per request
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"token {self.token}", "User-Agent": "SmartDeskPOS"})
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
     def upload(self, path_in_repo, file_bytes, commit_msg='SmartDesk backup'):
         url = f"{self.api}/contents/{path_in_repo.lstrip('/')}"
-        content = base64.b64encode(file_bytes).decode()
-        headers = {"Authorization": f"token {self.token}", "User-Agent": "SmartDeskPOS"}
-        r = requests.get(url, headers=headers)
+        # git blob hash of the local bytes; if GitHub already holds identical
+        # content at this path, skip the PUT entirely
+        blob_sha = hashlib.sha1(b"blob %d\0" % len(file_bytes) + file_bytes).hexdigest()
+        r = self.session.get(url)
         sha = None
         try:
             if r.status_code == 200:
@@ -302,12 +457,30 @@ class GitHubUploader:
                     sha = data['sha']
         except Exception:
             sha = None
+        if sha == blob_sha:
+            return True
+        content = base64.b64encode(file_bytes).decode()
         payload = {"message": commit_msg, "content": content}
         if sha:
             payload['sha'] = sha
-        resp = requests.put(url, headers=headers, data=json.dumps(payload))
+        resp = self.session.put(url, data=json.dumps(payload))
         return resp.status_code in (200,201)
 
+# app-scope uploader so repeat backups share one TLS connection; rebuilt
+# when the GitHub settings change
+_GH_UPLOADER = None
+_GH_CFG = None
+_GH_LOCK = threading.Lock()
+
+def get_gh_uploader(token, owner, repo):
+    global _GH_UPLOADER, _GH_CFG
+    cfg = (token, owner, repo)
+    with _GH_LOCK:
+        if _GH_UPLOADER is None or cfg != _GH_CFG:
+            _GH_UPLOADER = GitHubUploader(token, owner, repo)
+            _GH_CFG = cfg
+        return _GH_UPLOADER
+
 # ---------------- Twilio sender ----------------
 class TwilioSender:
     def __init__(self, sid, token, from_no):
@@ -320,38 +493,180 @@ class TwilioSender:
         msg = self.client.messages.create(body=body, from_=self.from_no, to=to)
         return msg.sid
 
+class SmsQueue:
+    # single background worker that reuses one Twilio client, paces sends to
+    # the long-code ceiling (~1 msg/s) and retries once on a 429, so bursty
+    # checkouts don't surface rate-limit errors
+    def __init__(self, db, min_interval=1.0):
+        self.db = db
+        self.min_interval = min_interval
+        self._q = queue.Queue()
+        self._sender = None
+        self._cfg = None
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, to, body):
+        self._q.put((to, body, 0))
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _get_sender(self):
+        cfg = (self.db.get_setting('tw_sid','') or ENV_TW_SID,
+               self.db.get_setting('tw_token','') or ENV_TW_TOKEN,
+               self.db.get_setting('tw_from','') or ENV_TW_FROM)
+        if not all(cfg) or TwilioClient is None:
+            return None
+        if self._sender is None or cfg != self._cfg:
+            # rebuild only when settings changed; keeps the HTTPS connection warm
+            self._sender = TwilioSender(*cfg)
+            self._cfg = cfg
+        return self._sender
+
+    def _run(self):
+        while True:
+            to, body, attempts = self._q.get()
+            try:
+                sender = self._get_sender()
+                if sender is not None:
+                    sender.send(to, body)
+            except Exception as e:
+                if getattr(e, 'status', None) == 429 and attempts < 3:
+                    time.sleep(self.min_interval * 2)
+                    self._q.put((to, body, attempts + 1))
+                else:
+                    print("SMS failed:", e)
+            time.sleep(self.min_interval)
+
+_SMS_QUEUE = None
+
+def get_sms_queue(db):
+    global _SMS_QUEUE
+    if _SMS_QUEUE is None:
+        _SMS_QUEUE = SmsQueue(db)
+    return _SMS_QUEUE
+
+# ---------------- Background work ----------------
+# shared pool for checkout I/O (PDF render, backup, SMS, GitHub push) so the
+# GUI thread never blocks on disk or network
+_CHECKOUT_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# ---------------- Cart math ----------------
+def _compute_totals(qtys, mrps, gsts):
+    # pure numeric aggregation for a cart, kept free of Qt/table access so the
+    # hot part of checkout is a single tight pass over plain floats
+    lines = [round(q * m, 2) for q, m in zip(qtys, mrps)]
+    subtotal = round(math.fsum(lines), 2)
+    gst_total = round(math.fsum(l * g / 100.0 for l, g in zip(lines, gsts)), 2)
+    return lines, subtotal, gst_total
+
+# ---------------- UPI QR ----------------
+@functools.lru_cache(maxsize=64)
+def _qr_image(upi_string):
+    # repeat amounts at the same UPI id are common; reuse the rendered image
+    return qrcode.make(upi_string).convert('RGB')
+
+def _qr_pixmap(upi_string):
+    # raw RGB memcpy from PIL to Qt — no PNG compress/decompress in between
+    img = _qr_image(upi_string)
+    data = img.tobytes('raw', 'RGB')
+    qimg = QtGui.QImage(data, img.width, img.height, img.width * 3, QtGui.QImage.Format_RGB888)
+    return QtGui.QPixmap.fromImage(qimg)
+
 # ---------------- Invoice / PDF / Backup ----------------
-def generate_invoice_pdf(invoice_no, invoice_data, out_path: Path):
-    c = canvas.Canvas(str(out_path), pagesize=A4)
-    w, h = A4
-    c.setFont("Helvetica-Bold", 16)
+# static invoice chrome, shared by every render
+_PDF_TITLE_FONT = ("Helvetica-Bold", 16)
+_PDF_BODY_FONT = ("Helvetica", 10)
+_PDF_COLUMN_HEADER = "HSN | Category | Item | Qty | MRP | GST% | Total"
+
+def _draw_invoice_chrome(c, h, invoice_no, invoice_data):
+    # store header, invoice metadata and the column header; returns the y
+    # where item rows start
+    c.setFont(*_PDF_TITLE_FONT)
     c.drawString(40, h-60, invoice_data.get('store', 'Smart Desk Mart'))
-    c.setFont("Helvetica", 10)
+    c.setFont(*_PDF_BODY_FONT)
     c.drawString(40, h-80, f"Invoice: {invoice_no}")
     c.drawString(40, h-95, f"Date: {datetime.now(timezone.utc).isoformat()}")
     c.drawString(40, h-110, f"Customer: {invoice_data.get('customer_name','-')} Phone: {invoice_data.get('customer_phone','-')}")
     y = h-140
-    c.drawString(40, y, "HSN | Category | Item | Qty | MRP | GST% | Total")
-    y -= 16
-    for it in invoice_data.get('items', []):
-        line = f"{it.get('hsn','-')} | {it.get('category','-')} | {it.get('name','-')} | {it.get('qty',0)} | {it.get('mrp')} | {it.get('gst')} | {it.get('total')}"
-        c.drawString(40, y, line)
-        y -= 14
-        if y < 80:
+    c.drawString(40, y, _PDF_COLUMN_HEADER)
+    return y - 16
+
+def generate_invoice_pdf(invoice_no, invoice_data, out_path: Path):
+    c = canvas.Canvas(str(out_path), pagesize=A4)
+    w, h = A4
+    y = _draw_invoice_chrome(c, h, invoice_no, invoice_data)
+    # build all row strings first, then emit one text object per page instead
+    # of one drawString operator per row
+    lines = [f"{it.get('hsn','-')} | {it.get('category','-')} | {it.get('name','-')} | {it.get('qty',0)} | {it.get('mrp')} | {it.get('gst')} | {it.get('total')}"
+             for it in invoice_data.get('items', [])]
+    i = 0
+    while i < len(lines):
+        cap = max(int((y - 80) // 14) + 1, 1)
+        chunk = lines[i:i+cap]
+        t = c.beginText(40, y)
+        t.setFont(*_PDF_BODY_FONT)
+        t.textLines("\n".join(chunk))
+        c.drawText(t)
+        y -= 14 * len(chunk)
+        i += cap
+        if i < len(lines):
             c.showPage(); y = h-60
     y -= 8
+    c.setFont(*_PDF_BODY_FONT)
     c.drawString(40, y, f"Total Amount: ₹{invoice_data.get('total')}")
     c.save()
 
+def _render_invoice_task(task):
+    # top-level so it pickles cleanly into worker processes
+    invoice_no, invoice_data, out_path = task
+    generate_invoice_pdf(invoice_no, invoice_data, Path(out_path))
+    return str(out_path)
+
+def generate_invoices_batch(tasks):
+    """Render many invoice PDFs in parallel; tasks = [(invoice_no, invoice_data, out_path), ...].
+
+    reportlab is CPU-bound, so bulk reprints scale with cores via processes."""
+    if not tasks:
+        return []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        return list(ex.map(_render_invoice_task, tasks))
+
 def backup_json(db: DB):
-    data = db.export_all()
+    # build rows straight from the cursors instead of materializing
+    # export_all()'s full dict; invoice 'data' is already JSON text in the DB,
+    # so it is spliced through verbatim rather than parsed and re-serialized.
+    # Returns (path, bytes) so callers that upload don't re-read the file.
     fname = BACKUP_DIR / f"backup_{int(datetime.now(timezone.utc).timestamp())}.json"
-    with open(fname, "w", encoding="utf8") as f:
-        json.dump(data, f, indent=2)
-    return fname
+    cur = db.conn.cursor()
+    buf = io.StringIO()
+    buf.write('{"products": [')
+    cur.execute('SELECT id,sku,name,category,unit,hsn,gst,mrp,stock FROM products')
+    for i, r in enumerate(cur):
+        if i: buf.write(', ')
+        buf.write(json.dumps({"id": r[0], "sku": r[1], "name": r[2], "category": r[3], "unit": r[4], "hsn": r[5], "gst": r[6], "mrp": r[7], "stock": r[8]}))
+    buf.write('], "invoices": [')
+    cur.execute('SELECT id,invoice_no,customer_phone,file_path,data,created_at FROM invoices')
+    for i, r in enumerate(cur):
+        if i: buf.write(', ')
+        buf.write('{"id": %s, "invoice_no": %s, "customer_phone": %s, "file_path": %s, "data": %s, "created_at": %s}' % (
+            json.dumps(r[0]), json.dumps(r[1]), json.dumps(r[2]), json.dumps(r[3]), r[4], json.dumps(r[5])))
+    buf.write(']}')
+    data = buf.getvalue().encode('utf8')
+    with open(fname, "wb") as f:
+        f.write(data)
+    return fname, data
 
 # ---------------- Small icon helper (safe painter init) ----------------
+# icons are immutable once drawn, so render each (name,size) once per process
+_ICON_CACHE = {}
+
 def create_icon_pixmap(name, size=44):
+    cached = _ICON_CACHE.get((name, size))
+    if cached is not None:
+        return cached
     pix = QtGui.QPixmap(size, size)
     pix.fill(QtCore.Qt.transparent)
     p = None
@@ -385,14 +700,23 @@ def create_icon_pixmap(name, size=44):
     finally:
         if p is not None:
             p.end()
+    _ICON_CACHE[(name, size)] = pix
     return pix
 
+@functools.lru_cache(maxsize=64)
+def _icon(name, size):
+    # QIcon wrapper cached alongside the pixmap so each is built once
+    return QtGui.QIcon(create_icon_pixmap(name, size))
+
 # ---------------- GUI Widgets ----------------
 class LoginWindow(QtWidgets.QWidget):
-    def __init__(self, db, main_win):
+    def __init__(self, db, main_win_factory):
         super().__init__()
         self.db = db
-        self.main_win = main_win
+        # the main window is built only after a successful login, so the
+        # login screen itself paints with nothing else on the critical path
+        self.main_win_factory = main_win_factory
+        self.main_win = None
         self.setWindowTitle("SmartDesk - Login")
         self.resize(760, 480)
         # theme set in main window; set application stylesheet from db
@@ -415,6 +739,8 @@ class LoginWindow(QtWidgets.QWidget):
         role = self.role.currentText(); u = self.user.text().strip(); p = self.pwd.text().strip()
         if self.db.validate_user(u, p, role):
             self.hide()
+            if self.main_win is None:
+                self.main_win = self.main_win_factory()
             # show main window (preserve the full screen behavior optional)
             self.main_win.show()
             return
@@ -449,6 +775,61 @@ class DashboardWidget(QtWidgets.QWidget):
         grid.addWidget(card('Settings','settings', lambda: parent.show_settings()), 2, 0)
         grid.addWidget(card('Logout','logout', lambda: QtWidgets.qApp.quit()), 2, 1)
 
+class ProductTableModel(QtCore.QAbstractTableModel):
+    # lightweight model over the product row tuples; no per-cell QObjects,
+    # repopulation is one beginResetModel/endResetModel
+    HEADERS = ["Select", "SKU", "Name", "Unit", "MRP", "GST%", "Stock"]
+    # product tuple indices for columns 1..6 (id,sku,name,category,unit,hsn,gst,mrp,stock)
+    _COL_TO_FIELD = {1: 1, 2: 2, 3: 4, 4: 7, 5: 6, 6: 8}
+
+    def __init__(self, checked, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._checked = checked  # shared with InventoryWidget._selected
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        rec = self._rows[index.row()]
+        col = index.column()
+        if col == 0:
+            if role == QtCore.Qt.CheckStateRole:
+                return QtCore.Qt.Checked if rec[1] in self._checked else QtCore.Qt.Unchecked
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return str(rec[self._COL_TO_FIELD[col]])
+        return None
+
+    def flags(self, index):
+        if index.column() == 0:
+            return QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if index.column() == 0 and role == QtCore.Qt.CheckStateRole:
+            sku = self._rows[index.row()][1]
+            if value == QtCore.Qt.Checked:
+                self._checked.add(sku)
+            else:
+                self._checked.discard(sku)
+            self.dataChanged.emit(index, index, [role])
+            return True
+        return False
+
 class InventoryWidget(QtWidgets.QWidget):
     def __init__(self, db, main_win):
         super().__init__()
@@ -466,8 +847,9 @@ class InventoryWidget(QtWidgets.QWidget):
         body = QtWidgets.QHBoxLayout()
         self.cat_list = QtWidgets.QListWidget(); self.cat_list.setMaximumWidth(260)
         body.addWidget(self.cat_list)
-        self.table = QtWidgets.QTableWidget(0,7)
-        self.table.setHorizontalHeaderLabels(["Select","SKU","Name","Unit","MRP","GST%","Stock"])
+        self.model = ProductTableModel(self._selected, self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.Stretch)
         body.addWidget(self.table)
         layout.addLayout(body)
@@ -478,11 +860,17 @@ class InventoryWidget(QtWidgets.QWidget):
         self.add_selected_btn = QtWidgets.QPushButton("Add Selected to Billing"); self.add_selected_btn.setEnabled(False)
         bottom.addWidget(self.add_selected_btn)
         layout.addLayout(bottom)
+        # debounce search: rebuild the table once typing pauses, not per key
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
         # signals
         self.reload_btn.clicked.connect(self.load_categories)
         self.cat_list.currentItemChanged.connect(self.on_category_changed)
-        self.search.textChanged.connect(self.populate_items)
+        self.search.textChanged.connect(self._search_timer.start)
+        self._search_timer.timeout.connect(self.populate_items)
         self.add_selected_btn.clicked.connect(self.add_selected_to_billing)
+        self.model.dataChanged.connect(self.update_selection_status)
         # initial load
         self.load_categories()
 
@@ -490,8 +878,7 @@ class InventoryWidget(QtWidgets.QWidget):
         self.cat_list.clear()
         for i, c in enumerate(CATEGORIES):
             it = QtWidgets.QListWidgetItem(c)
-            color = CATEGORY_COLORS[i % len(CATEGORY_COLORS)]
-            it.setBackground(QtGui.QColor(color))
+            it.setBackground(category_qcolor(i))
             self.cat_list.addItem(it)
         if self.cat_list.count() > 0:
             self.cat_list.setCurrentRow(0)
@@ -502,50 +889,18 @@ class InventoryWidget(QtWidgets.QWidget):
             self.populate_items()
 
     def populate_items(self):
-        # avoid itemChanged recursion
-        try:
-            self.table.itemChanged.disconnect(self.on_item_changed)
-        except Exception:
-            pass
-        self.table.setRowCount(0)
         if not hasattr(self, 'current_category'):
+            self.model.setRows([])
             return
         q = self.search.text().strip().lower()
-        rows = self.db.products_by_category(self.current_category)
-        for rec in rows:
-            _id, sku, name, cat, unit, hsn, gst, mrp, stock = rec
-            display = f"{sku} {name}".lower()
-            if q and q not in display:
-                continue
-            r = self.table.rowCount(); self.table.insertRow(r)
-            # checkbox item
-            chk = QtWidgets.QTableWidgetItem()
-            chk.setFlags(QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled)
-            chk.setCheckState(QtCore.Qt.Unchecked)
-            self.table.setItem(r, 0, chk)
-            self.table.setItem(r, 1, QtWidgets.QTableWidgetItem(sku))
-            self.table.setItem(r, 2, QtWidgets.QTableWidgetItem(name))
-            self.table.setItem(r, 3, QtWidgets.QTableWidgetItem(unit))
-            self.table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(mrp)))
-            self.table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(gst)))
-            self.table.setItem(r, 6, QtWidgets.QTableWidgetItem(str(stock)))
-        # reconnect
-        self.table.itemChanged.connect(self.on_item_changed)
-        self.update_selection_status()
-
-    def on_item_changed(self, item):
-        # watch only checkbox column 0
-        if item.column() != 0:
-            return
-        row = item.row()
-        sku_item = self.table.item(row, 1)
-        if not sku_item:
-            return
-        sku = sku_item.text()
-        if item.checkState() == QtCore.Qt.Checked:
-            self._selected.add(sku)
+        rows = self.db.products_by_category_cached(self.current_category)
+        if q:
+            hay = self.db.category_search_haystack(self.current_category)
+            filtered = [rec for rec, h in zip(rows, hay) if q in h]
         else:
-            self._selected.discard(sku)
+            filtered = rows
+        # one model reset: no per-cell item objects, no per-row layout pass
+        self.model.setRows(filtered)
         self.update_selection_status()
 
     def update_selection_status(self):
@@ -557,20 +912,27 @@ class InventoryWidget(QtWidgets.QWidget):
         if not self._selected:
             return
         bw = self.main_win.open_billing()
-        for sku in list(self._selected):
-            rec = self.db.get_product_by_sku(sku)
-            if not rec: continue
-            _, sku, name, category, unit, hsn, gst, mrp, stock = rec
-            bw.add_row_from_inventory({"hsn": hsn, "category": category, "name": name, "qty": 1, "mrp": mrp, "gst": gst, "sku": sku})
+        # one IN(...) query for the whole selection instead of one per sku
+        bw.table.setUpdatesEnabled(False)
+        try:
+            for rec in self.db.get_products_by_skus(list(self._selected)):
+                _, sku, name, category, unit, hsn, gst, mrp, stock = rec
+                bw.add_row_from_inventory({"hsn": hsn, "category": category, "name": name, "qty": 1, "mrp": mrp, "gst": gst, "sku": sku})
+        finally:
+            bw.table.setUpdatesEnabled(True)
         # clear selection & refresh view
         self._selected.clear()
         self.populate_items()
         bw.show(); bw.raise_(); bw.activateWindow()
 
 class BillingWindow(QtWidgets.QWidget):
+    # emitted from the checkout worker; queued back onto the GUI thread
+    checkout_done = QtCore.pyqtSignal(str)
+
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.checkout_done.connect(self._on_checkout_done)
         self.setWindowTitle("Billing - SmartDesk")
         self.resize(980,720)
         layout = QtWidgets.QVBoxLayout(self)
@@ -601,21 +963,36 @@ class BillingWindow(QtWidgets.QWidget):
         payrow.addWidget(self.pay_combo); payrow.addWidget(self.pay_btn)
         layout.addLayout(payrow)
         self.pay_btn.clicked.connect(self.pay)
+        # warm the QR cache in the background when the cashier picks QR/UPI,
+        # so the scan dialog appears without a render pause
+        self.pay_combo.currentTextChanged.connect(self._prefetch_qr)
+        # parallel numeric array of line totals; recalculate_total sums this
+        # instead of re-parsing every table cell
+        self._line_totals = []
         # track edits to quantity
         self.table.itemChanged.connect(self.on_item_changed)
 
     def add_row_from_inventory(self, item):
-        r = self.table.rowCount(); self.table.insertRow(r)
-        self.table.setItem(r,0, QtWidgets.QTableWidgetItem(str(item.get("hsn",""))))
-        self.table.setItem(r,1, QtWidgets.QTableWidgetItem(str(item.get("category",""))))
-        self.table.setItem(r,2, QtWidgets.QTableWidgetItem(str(item.get("name",""))))
-        qty_item = QtWidgets.QTableWidgetItem(str(item.get("qty",1)))
-        qty_item.setFlags(qty_item.flags() | QtCore.Qt.ItemIsEditable)
-        self.table.setItem(r,3, qty_item)
-        self.table.setItem(r,4, QtWidgets.QTableWidgetItem(str(item.get("mrp",0.0))))
-        self.table.setItem(r,5, QtWidgets.QTableWidgetItem(str(item.get("gst",0))))
-        total = round(float(item.get("mrp",0.0)) * float(item.get("qty",1)),2)
-        self.table.setItem(r,6, QtWidgets.QTableWidgetItem(str(total)))
+        # block itemChanged while filling the row; it only matters for user edits
+        self.table.blockSignals(True)
+        try:
+            r = self.table.rowCount(); self.table.insertRow(r)
+            self.table.setItem(r,0, QtWidgets.QTableWidgetItem(str(item.get("hsn",""))))
+            self.table.setItem(r,1, QtWidgets.QTableWidgetItem(str(item.get("category",""))))
+            name_item = QtWidgets.QTableWidgetItem(str(item.get("name","")))
+            # carry the sku with the row so checkout can deduct by exact key
+            name_item.setData(QtCore.Qt.UserRole, item.get("sku"))
+            self.table.setItem(r,2, name_item)
+            qty_item = QtWidgets.QTableWidgetItem(str(item.get("qty",1)))
+            qty_item.setFlags(qty_item.flags() | QtCore.Qt.ItemIsEditable)
+            self.table.setItem(r,3, qty_item)
+            self.table.setItem(r,4, QtWidgets.QTableWidgetItem(str(item.get("mrp",0.0))))
+            self.table.setItem(r,5, QtWidgets.QTableWidgetItem(str(item.get("gst",0))))
+            total = round(float(item.get("mrp",0.0)) * float(item.get("qty",1)),2)
+            self.table.setItem(r,6, QtWidgets.QTableWidgetItem(str(total)))
+        finally:
+            self.table.blockSignals(False)
+        self._line_totals.append(total)
         self.recalculate_total()
 
     def on_item_changed(self, it):
@@ -624,42 +1001,44 @@ class BillingWindow(QtWidgets.QWidget):
                 row = it.row()
                 qty = float(it.text())
                 mrp = float(self.table.item(row,4).text())
-                self.table.item(row,6).setText(str(round(qty*mrp,2)))
+                line = round(qty*mrp,2)
+                self.table.item(row,6).setText(str(line))
+                self._line_totals[row] = line
             except Exception:
                 pass
             self.recalculate_total()
 
     def recalculate_total(self):
-        total = 0.0
-        for r in range(self.table.rowCount()):
-            try:
-                total += float(self.table.item(r,6).text())
-            except Exception:
-                pass
+        total = math.fsum(self._line_totals)
         self.total_label.setText(f"Total: ₹{round(total,2)}")
 
     def remove_selected(self):
         r = self.table.currentRow()
         if r >= 0:
-            self.table.removeRow(r); self.recalculate_total()
+            self.table.removeRow(r)
+            del self._line_totals[r]
+            self.recalculate_total()
 
     def pay(self):
         method = self.pay_combo.currentText()
         cname = self.cust_name.text().strip(); phone = self.cust_phone.text().strip()
-        items = []; total = 0.0
-        for r in range(self.table.rowCount()):
+        # snapshot the model once with local references, then parse — no
+        # repeated self.table.item attribute resolution inside the hot loop
+        cell = self.table.item
+        rows = [([(i.text() if i else '') for i in (cell(r,0), cell(r,1), cell(r,2), cell(r,3), cell(r,4), cell(r,5))],
+                 cell(r,2).data(QtCore.Qt.UserRole) if cell(r,2) else None)
+                for r in range(self.table.rowCount())]
+        items = []
+        for (hsn, cat, name, qty, mrp, gst), sku in rows:
             try:
-                hsn = self.table.item(r,0).text()
-                cat = self.table.item(r,1).text()
-                name = self.table.item(r,2).text()
-                qty = float(self.table.item(r,3).text())
-                mrp = float(self.table.item(r,4).text())
-                gst = float(self.table.item(r,5).text())
-                line = float(self.table.item(r,6).text())
-                items.append({"hsn":hsn,"category":cat,"name":name,"qty":qty,"mrp":mrp,"gst":gst,"total":line})
-                total += line
+                qty = float(qty); mrp = float(mrp); gst = float(gst)
             except Exception:
-                pass
+                continue
+            items.append({"hsn":hsn,"category":cat,"name":name,"sku":sku,"qty":qty,"mrp":mrp,"gst":gst})
+        lines, total, _gst_total = _compute_totals(
+            [it["qty"] for it in items], [it["mrp"] for it in items], [it["gst"] for it in items])
+        for it, line in zip(items, lines):
+            it["total"] = line
         if not items:
             QtWidgets.QMessageBox.warning(self, "Empty", "Add items before paying"); return
         invoice_no = f"INV{int(datetime.now(timezone.utc).timestamp())}"
@@ -667,9 +1046,8 @@ class BillingWindow(QtWidgets.QWidget):
         # UPI/QR flow
         if method in ("QR","UPI"):
             upi_id = self.db.get_setting('upi_id','')
-            buf = qrcode.make(f"upi://pay?pa={upi_id}&pn=Merchant&am={round(total,2)}")
-            b = io.BytesIO(); buf.save(b, format='PNG'); b.seek(0)
-            pix = QtGui.QPixmap(); pix.loadFromData(b.read())
+            # hits the lru cache when _prefetch_qr already rendered this amount
+            pix = _qr_pixmap(self._upi_string(round(total,2)))
             dlg = QtWidgets.QDialog(self); dlg.setWindowTitle("Scan to Pay"); lay = QtWidgets.QVBoxLayout(dlg)
             lb = QtWidgets.QLabel(); lb.setPixmap(pix); lb.setAlignment(QtCore.Qt.AlignCenter); lay.addWidget(lb)
             lay.addWidget(QtWidgets.QLabel(f"UPI ID: {upi_id}\nAmount: ₹{round(total,2)}"))
@@ -677,55 +1055,85 @@ class BillingWindow(QtWidgets.QWidget):
             dlg.exec_()
         else:
             QtWidgets.QMessageBox.information(self, "Payment", f"{method} selected (simulated)")
-        # Deduct stock best-effort (match by SKU first, else by name)
+        # Deduct stock best-effort (by SKU carried on the row, else by name)
+        sku_deductions = []
+        name_deductions = []
         for it in items:
-            # try by SKU search in products (we don't store sku in table rows for billing)
-            # Attempt match by name (best-effort)
-            cur = self.db.conn.cursor()
-            cur.execute('SELECT sku,stock FROM products WHERE name=? LIMIT 1', (it['name'],))
-            r = cur.fetchone()
-            if r:
-                sku, stock = r
-                try:
-                    self.db.update_stock(sku, -int(round(it['qty'])))
-                except Exception:
-                    pass
-        # save invoice pdf and db, backup and optional git push
+            delta = -int(round(it['qty']))
+            if it.get('sku'):
+                sku_deductions.append((delta, it['sku']))
+            else:
+                name_deductions.append((delta, it['name']))
+        # save invoice and stock deductions in one transaction (POS-critical
+        # state), then run the slow I/O — PDF render, JSON backup, SMS,
+        # GitHub push — on the worker pool
         out = INVOICES_DIR / f"{invoice_no}.pdf"
-        generate_invoice_pdf(invoice_no, invoice_data, out)
-        self.db.save_invoice(invoice_no, phone, invoice_data, str(out))
-        backup = backup_json(self.db)
-        # Twilio send if configured
-        sent = False
+        self.db.save_checkout(invoice_no, phone, invoice_data, str(out),
+                              sku_pairs=sku_deductions, name_pairs=name_deductions)
         tw_sid = self.db.get_setting('tw_sid','') or ENV_TW_SID
         tw_token = self.db.get_setting('tw_token','') or ENV_TW_TOKEN
         tw_from = self.db.get_setting('tw_from','') or ENV_TW_FROM
-        if tw_sid and tw_token and tw_from and TwilioClient is not None and phone:
-            try:
-                ts = TwilioSender(tw_sid, tw_token, tw_from)
-                body = f"{invoice_data.get('store')} Invoice {invoice_no} Total ₹{invoice_data.get('total')}"
-                ts.send(phone, body)
-                sent = True
-            except Exception as e:
-                print("SMS failed:", e)
-        # GitHub optional push of JSON backup
-        pushed = False
         gh_token = self.db.get_setting('gh_token','')
         gh_owner = self.db.get_setting('gh_owner','') or DEFAULT_GH_OWNER
         gh_repo = self.db.get_setting('gh_repo','') or DEFAULT_GH_REPO
         gh_path = self.db.get_setting('gh_path','') or DEFAULT_GH_PATH
+        self.pay_btn.setEnabled(False)
+
+        # PDF and backup+push are independent; overlap them on the pool.
+        # SMS goes through the paced queue, which owns its own worker.
+        pdf_f = _CHECKOUT_EXECUTOR.submit(generate_invoice_pdf, invoice_no, invoice_data, out)
+        sms_queued = False
+        if tw_sid and tw_token and tw_from and TwilioClient is not None and phone:
+            body = f"{invoice_data.get('store')} Invoice {invoice_no} Total ₹{invoice_data.get('total')}"
+            get_sms_queue(self.db).enqueue(phone, body)
+            sms_queued = True
+        backup_f = _CHECKOUT_EXECUTOR.submit(self._backup_and_push, invoice_no,
+                                             (gh_token, gh_owner, gh_repo, gh_path))
+        # the barrier blocks, so it lives on its own thread, not a pool worker
+        threading.Thread(target=self._emit_checkout_summary,
+                         args=(out, pdf_f, sms_queued, backup_f), daemon=True).start()
+
+    def _backup_and_push(self, invoice_no, gh_cfg):
+        gh_token, gh_owner, gh_repo, gh_path = gh_cfg
+        backup, jbytes = backup_json(self.db)
+        pushed = False
         try:
             if gh_token and gh_owner and gh_repo:
-                uploader = GitHubUploader(gh_token, gh_owner, gh_repo)
-                with open(backup, 'rb') as f:
-                    jbytes = f.read()
-                dest = gh_path.strip('/') if gh_path else f"backups/{backup.name}"
+                uploader = get_gh_uploader(gh_token, gh_owner, gh_repo)
+                # gzip before upload (~5-10x smaller JSON); mtime=0 keeps the
+                # bytes deterministic so the blob-sha dedupe still works
+                gz = gzip.compress(jbytes, compresslevel=6, mtime=0)
+                dest = gh_path.strip('/') if gh_path else f"backups/{backup.name}.gz"
                 if not dest:
-                    dest = backup.name
-                pushed = uploader.upload(dest, jbytes, commit_msg=f"SmartDesk backup {invoice_no}")
+                    dest = f"{backup.name}.gz"
+                pushed = uploader.upload(dest, gz, commit_msg=f"SmartDesk backup {invoice_no}")
         except Exception as ex:
             print("GitHub upload failed:", ex)
-        QtWidgets.QMessageBox.information(self, "Done", f"Invoice saved: {out}\nBackup: {backup}\nSMS sent: {sent}\nGitHub pushed: {pushed}")
+        return backup, pushed
+
+    def _emit_checkout_summary(self, out, pdf_f, sms_queued, backup_f):
+        try:
+            pdf_f.result()
+        except Exception as ex:
+            print("PDF generation failed:", ex)
+        backup = pushed = None
+        try:
+            backup, pushed = backup_f.result()
+        except Exception as ex:
+            print("Backup failed:", ex)
+        self.checkout_done.emit(f"Invoice saved: {out}\nBackup: {backup}\nSMS queued: {sms_queued}\nGitHub pushed: {pushed}")
+
+    def _upi_string(self, amount):
+        upi_id = self.db.get_setting('upi_id','')
+        return f"upi://pay?pa={upi_id}&pn=Merchant&am={amount}"
+
+    def _prefetch_qr(self, method):
+        if method in ("QR","UPI"):
+            amount = round(math.fsum(self._line_totals), 2)
+            _CHECKOUT_EXECUTOR.submit(_qr_image, self._upi_string(amount))
+
+    def _on_checkout_done(self, summary):
+        QtWidgets.QMessageBox.information(self, "Done", summary)
         self.close()
 
 class ReportsWidget(QtWidgets.QWidget):
@@ -745,19 +1153,46 @@ class ReportsWidget(QtWidgets.QWidget):
 
     def gen(self, period):
         cur = self.db.conn.cursor()
-        cur.execute('SELECT COUNT(*) FROM products'); pcount = cur.fetchone()[0]
-        cur.execute('SELECT COUNT(*) FROM invoices'); inv = cur.fetchone()[0]
-        cur.execute('SELECT COUNT(*) FROM products WHERE stock<=5'); low = cur.fetchone()[0]
+        # one round trip for all three counts
+        cur.execute('SELECT (SELECT COUNT(*) FROM products), (SELECT COUNT(*) FROM invoices), '
+                    '(SELECT COUNT(*) FROM products WHERE stock<=5)')
+        pcount, inv, low = cur.fetchone()
         now = datetime.now(timezone.utc)
         report = (f"Report: {period} at {now.isoformat()}\nProducts total: {pcount}\nInvoices total: {inv}\nLow stock items (<=5): {low}")
         self.out.setPlainText(report)
 
+class ProductListModel(QtCore.QAbstractListModel):
+    # backs the stock-inward combo box; 1100 rows stay as tuples instead of
+    # being copied into QComboBox item storage
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        r = self._rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return f"{r[1]} - {r[2]}"
+        if role == QtCore.Qt.UserRole:
+            return r[1]
+        return None
+
 class StockInwardWidget(QtWidgets.QWidget):
     def __init__(self, db):
         super().__init__(); self.db = db
         v = QtWidgets.QVBoxLayout(self)
         h = QtWidgets.QHBoxLayout()
-        self.product_combo = QtWidgets.QComboBox(); self.refresh_products()
+        self.product_combo = QtWidgets.QComboBox()
+        self._products_model = ProductListModel(self)
+        self.product_combo.setModel(self._products_model)
+        self.refresh_products()
         self.qty_spin = QtWidgets.QSpinBox(); self.qty_spin.setMaximum(100000)
         add_btn = QtWidgets.QPushButton("Add Stock")
         h.addWidget(self.product_combo); h.addWidget(self.qty_spin); h.addWidget(add_btn)
@@ -766,9 +1201,7 @@ class StockInwardWidget(QtWidgets.QWidget):
         add_btn.clicked.connect(self.add_stock)
 
     def refresh_products(self):
-        self.product_combo.clear()
-        for r in self.db.list_products():
-            self.product_combo.addItem(f"{r[1]} - {r[2]}", userData=r[1])
+        self._products_model.setRows(self.db.list_products())
 
     def add_stock(self):
         sku = self.product_combo.currentData()
@@ -833,6 +1266,13 @@ class SettingsWidget(QtWidgets.QWidget):
             self.main_win.apply_theme('light')
 
 # ---------------- Main Window ----------------
+# (label, icon name) pairs for the sidebar; built once at module scope
+_SIDEBAR_BUTTONS = [
+    ('Dashboard','billing'), ('Billing','billing'), ('Inventory','inventory'),
+    ('Reports','reports'), ('Stock Inwards','stock'), ('Settings','settings'),
+    ('Logout','logout')
+]
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self, db):
         super().__init__(); self.db = db
@@ -851,33 +1291,42 @@ class MainWindow(QtWidgets.QMainWindow):
         sidebar.addSpacing(8)
         # sidebar buttons
         btns = {}
-        for name in [('Dashboard','billing'),('Billing','billing'),('Inventory','inventory'),('Reports','reports'),('Stock Inwards','stock'),('Settings','settings'),('Logout','logout')]:
+        for name in _SIDEBAR_BUTTONS:
             b = QtWidgets.QPushButton(name[0]); b.setMinimumHeight(44)
-            b.setIcon(QtGui.QIcon(create_icon_pixmap(name[1],26)))
+            b.setIcon(_icon(name[1], 26))
             btns[name[0]] = b; sidebar.addWidget(b)
         sidebar.addStretch()
         h.addLayout(sidebar,1)
-        # stack
+        # stack; panel widgets are built lazily on first visit so the
+        # login-to-dashboard path only pays for the dashboard
         self.stack = QtWidgets.QStackedWidget(); h.addWidget(self.stack,6)
-        self.dashboard_widget = DashboardWidget(self)
-        self.inventory_widget = InventoryWidget(self.db, self)
-        self.reports_widget = ReportsWidget(self.db)
-        self.stock_widget = StockInwardWidget(self.db)
-        self.settings_widget = SettingsWidget(self.db, self)
-        self.stack.addWidget(self.dashboard_widget)
-        self.stack.addWidget(self.inventory_widget)
-        self.stack.addWidget(self.reports_widget)
-        self.stack.addWidget(self.stock_widget)
-        self.stack.addWidget(self.settings_widget)
+        self._factories = {
+            'dashboard': lambda: DashboardWidget(self),
+            'inventory': lambda: InventoryWidget(self.db, self),
+            'reports': lambda: ReportsWidget(self.db),
+            'stock': lambda: StockInwardWidget(self.db),
+            'settings': lambda: SettingsWidget(self.db, self),
+        }
+        self._widgets = {}
         # connect
-        btns['Dashboard'].clicked.connect(lambda: self.stack.setCurrentWidget(self.dashboard_widget))
+        btns['Dashboard'].clicked.connect(lambda: self._show('dashboard'))
         btns['Billing'].clicked.connect(self.open_billing)
-        btns['Inventory'].clicked.connect(lambda: self.stack.setCurrentWidget(self.inventory_widget))
-        btns['Reports'].clicked.connect(lambda: self.stack.setCurrentWidget(self.reports_widget))
-        btns['Stock Inwards'].clicked.connect(lambda: self.stack.setCurrentWidget(self.stock_widget))
-        btns['Settings'].clicked.connect(lambda: self.stack.setCurrentWidget(self.settings_widget))
+        btns['Inventory'].clicked.connect(lambda: self._show('inventory'))
+        btns['Reports'].clicked.connect(lambda: self._show('reports'))
+        btns['Stock Inwards'].clicked.connect(lambda: self._show('stock'))
+        btns['Settings'].clicked.connect(lambda: self._show('settings'))
         btns['Logout'].clicked.connect(QtWidgets.qApp.quit)
         self.billing_win = None
+        self._show('dashboard')
+
+    def _show(self, key):
+        w = self._widgets.get(key)
+        if w is None:
+            w = self._factories[key]()
+            self._widgets[key] = w
+            self.stack.addWidget(w)
+        self.stack.setCurrentWidget(w)
+        return w
 
     def apply_theme(self, theme):
         if theme == 'dark':
@@ -892,16 +1341,16 @@ class MainWindow(QtWidgets.QMainWindow):
         return self.billing_win
 
     def show_inventory(self):
-        self.stack.setCurrentWidget(self.inventory_widget)
+        self._show('inventory')
 
     def show_reports(self):
-        self.stack.setCurrentWidget(self.reports_widget)
+        self._show('reports')
 
     def show_stock(self):
-        self.stack.setCurrentWidget(self.stock_widget)
+        self._show('stock')
 
     def show_settings(self):
-        self.stack.setCurrentWidget(self.settings_widget)
+        self._show('settings')
 
 # ---------------- App bootstrap ----------------
 def main():
@@ -914,10 +1363,8 @@ def main():
         app.setStyleSheet(STYLE_DARK)
     else:
         app.setStyleSheet(STYLE_LIGHT)
-    main_win = MainWindow(db)
-    login = LoginWindow(db, main_win)
+    login = LoginWindow(db, lambda: MainWindow(db))
     login.show()
-    main_win.hide()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":